@@ -1,29 +1,46 @@
 import numpy as np
+from math import sqrt
 from hypervehicle.geometry import Vector3, Bezier
 from hypervehicle.components import Wing, RevolvedComponent, Fin
 from hypervehicle.geometry import Vector3, Bezier, Line, Polyline, Arc, CoonsPatch
 
+# Leading edge width Bezier control point y-values, at x = (0.0, 0.5, 1.0)
+_LE_WIDTH_CTRL_Y = (0.01, 0.1, 0.01)
+
 
 def leading_edge_width_function(r):
-    temp = Bezier(
-        [
-            Vector3(x=0.0, y=0.01),
-            Vector3(x=0.5, y=0.1),
-            Vector3(x=1.0, y=0.01),
-        ]
-    )
-    le_width = temp(r).y
+    """Returns the leading edge width along the span. Accepts a scalar
+    or an array of spanwise stations."""
+    # Quadratic de Casteljau evaluation of the Bezier y-component
+    y0, y1, y2 = _LE_WIDTH_CTRL_Y
+    q0 = (1.0 - r) * y0 + r * y1
+    q1 = (1.0 - r) * y1 + r * y2
+    le_width = (1.0 - r) * q0 + r * q1
     return le_width
 
 
+class _UniformThickness:
+    """A constant thickness offset function."""
+
+    __slots__ = ["offset", "offset_array"]
+
+    def __init__(self, dz: float):
+        self.offset = Vector3(x=0.0, y=0.0, z=dz)
+        self.offset_array = np.array([0.0, 0.0, dz])
+
+    def __call__(self, x: float, y: float, z: float = 0):
+        return self.offset
+
+    def vectorized(self, x: np.ndarray, y: np.ndarray, z: np.ndarray = 0):
+        """Returns the offset for arrays of points, with shape
+        x.shape + (3,)."""
+        return np.broadcast_to(self.offset_array, np.shape(x) + (3,))
+
+
 def uniform_thickness_function(thickness: float, side: str):
     """Returns a function handle."""
     m = -1 if side == "top" else 1
-
-    def tf(x: float, y: float, z: float = 0):
-        return Vector3(x=0.0, y=0.0, z=m * thickness / 2)
-
-    return tf
+    return _UniformThickness(m * thickness / 2)
 
 
 def circle_patch(centre: Vector3, r: float, plane: str = "xy") -> CoonsPatch:
@@ -46,6 +63,36 @@ def circle_patch(centre: Vector3, r: float, plane: str = "xy") -> CoonsPatch:
     return patch
 
 
+def _ogive_fairing(h: float, r_n: float, r_o: float, L_o: float):
+    """Returns the revolve line of an ogive nose."""
+    # Ogive Dependencies
+    x_o = -sqrt((r_o - r_n) ** 2 - (r_o - h) ** 2)
+    y_t = r_n * (r_o - h) / (r_o - r_n)
+    x_t = x_o - sqrt(r_n**2 - y_t**2)
+    x_a = x_o - r_n
+
+    # Fairing points
+    a_n = Vector3(-x_a, 0)
+    a_o = Vector3(-x_t, y_t)
+    b_o = Vector3(0, h)
+    c_o = Vector3(0, -r_o + h)
+    c_n = Vector3(-x_o, 0)
+    f1 = Vector3(-L_o, h)
+    fb1 = Vector3(-L_o, 0)
+
+    # Nose and ogive arcs
+    nose_arc = Arc(a_n, a_o, c_n)
+    ogive_arc = Arc(a_o, b_o, c_o)
+
+    # Nose body and base
+    fairing_line = Line(b_o, f1)
+    fb_line = Line(f1, fb1)
+
+    fairing = Polyline([nose_arc, ogive_arc, fairing_line, fb_line])
+
+    return fairing
+
+
 class OgiveNose(RevolvedComponent):
     def __init__(
         self,
@@ -79,35 +126,7 @@ class OgiveNose(RevolvedComponent):
         # TODO - think about locating nose, is the tip at (0,0,0)?
         # Document this
 
-        # Ogive Dependencies
-        x_o = -np.sqrt((r_o - r_n) ** 2 - (r_o - h) ** 2)
-        y_t = r_n * (r_o - h) / (r_o - r_n)
-        x_t = x_o - np.sqrt(r_n**2 - y_t**2)
-        x_a = x_o - r_n
-
-        # Ogive arc
-        a_o = Vector3(-x_t, y_t)
-        b_o = Vector3(0, h)
-        c_o = Vector3(0, -r_o + h)
-        ogive_arc = Arc(a_o, b_o, c_o)
-
-        # Nose arc
-        a_n = Vector3(-x_a, 0)
-        b_n = a_o
-        c_n = Vector3(-x_o, 0)
-        nose_arc = Arc(a_n, b_n, c_n)
-
-        # Nose body
-        f0 = b_o
-        f1 = f0 - Vector3(L_o, 0)
-        fairing_line = Line(f0, f1)
-
-        # Nose body base
-        fb0 = f1
-        fb1 = Vector3(f1.x, 0)
-        fb_line = Line(fb0, fb1)
-
-        fairing = Polyline([nose_arc, ogive_arc, fairing_line, fb_line])
+        fairing = _ogive_fairing(h, r_n, r_o, L_o)
 
         super().__init__(
             revolve_line=fairing, stl_resolution=stl_resolution, name=name, **kwargs
@@ -1,3 +1,4 @@
+import struct
 import pymeshfix
 import numpy as np
 from stl import mesh
@@ -8,7 +9,7 @@ from collections import Counter
 from hypervehicle.geometry import Vector3
 from gdtk.geom.sgrid import StructuredGrid
 from typing import Callable, Union, Optional
-from hypervehicle.utilities import surfce_to_stl
+from hypervehicle.utilities import surfce_to_stl, surface_stations
 from hypervehicle.geometry import (
     CurvedPatch,
     RotatedPatch,
@@ -16,6 +17,14 @@ from hypervehicle.geometry import (
     OffsetPatchFunction,
 )
 
+# Minimum number of patches for which surfaces are generated concurrently
+MIN_MULTIPROCESS_PATCHES = 4
+
+
+def _patch_surface(key: str, patch, res_r: int, res_s: int, stations: tuple):
+    """Generates the STL surface of a single patch."""
+    return key, surfce_to_stl(patch, res_r, res_s, stations=stations)
+
 
 class AbstractComponent:
     componenttype = None
@@ -115,6 +124,7 @@ class Component(AbstractComponent):
         self.surfaces = None  # STL surfaces for each patch
         self.stl_resolution = stl_resolution  # STL cells per edge
         self._mesh = None  # STL mesh for entire component
+        self._eval_cache = {}  # tessellation stations for each resolution
 
         # Curvature functions
         self._curvatures = None
@@ -135,6 +145,9 @@ class Component(AbstractComponent):
         # Ghost component
         self._ghost = False
 
+        # Generate patch surfaces concurrently
+        self._multiprocess = False
+
         # Component name
         self.name = name
 
@@ -168,13 +181,15 @@ class Component(AbstractComponent):
     def curve(self):
         if self._curvatures is not None:
             for curvature in self._curvatures:
-                for key, patch in self.patches.items():
-                    self.patches[key] = CurvedPatch(
+                self.patches = {
+                    key: CurvedPatch(
                         underlying_surf=patch,
                         direction=curvature[0],
                         fun=curvature[1],
                         fun_dash=curvature[2],
                     )
+                    for key, patch in self.patches.items()
+                }
 
     @property
     def mesh(self):
@@ -187,8 +202,14 @@ class Component(AbstractComponent):
                 # Generate surfaces
                 self.surface()
 
-            # Combine all surface data
-            surface_data = np.concatenate([s[1].data for s in self.surfaces.items()])
+            # Combine all surface data into a single preallocated buffer
+            n_triangles = sum(s.data.shape[0] for s in self.surfaces.values())
+            surface_data = np.empty(n_triangles, dtype=mesh.Mesh.dtype)
+            offset = 0
+            for surface in self.surfaces.values():
+                n = surface.data.shape[0]
+                surface_data[offset : offset + n] = surface.data
+                offset += n
 
             # Create nominal STL mesh
             self._mesh = mesh.Mesh(surface_data)
@@ -200,8 +221,11 @@ class Component(AbstractComponent):
         self._mesh = value
 
     def rotate(self, angle: float = 0, axis: str = "y"):
-        for key, patch in self.patches.items():
-            self.patches[key] = RotatedPatch(patch, np.deg2rad(angle), axis=axis)
+        angle = np.deg2rad(angle)
+        self.patches = {
+            key: RotatedPatch.compose(patch, angle, axis=axis)
+            for key, patch in self.patches.items()
+        }
 
     def translate(self, offset: Union[Callable, Vector3]):
         if isinstance(offset, Vector3):
@@ -211,8 +235,10 @@ class Component(AbstractComponent):
             offset_function = offset
 
         # Could wrap it in a lambda if provided
-        for key, patch in self.patches.items():
-            self.patches[key] = OffsetPatchFunction(patch, offset_function)
+        self.patches = {
+            key: OffsetPatchFunction(patch, offset_function)
+            for key, patch in self.patches.items()
+        }
 
     def transform(self):
         for transform in self._transformations:
@@ -221,21 +247,29 @@ class Component(AbstractComponent):
 
     def apply_modifier(self):
         if self._modifier_function:
-            for key, patch in self.patches.items():
-                self.patches[key] = OffsetPatchFunction(patch, self._modifier_function)
+            self.patches = {
+                key: OffsetPatchFunction(patch, self._modifier_function)
+                for key, patch in self.patches.items()
+            }
 
     def reflect(self, axis: str = None):
         axis = self._reflection_axis if self._reflection_axis is not None else axis
         if axis is not None:
             # Create mirrored patches
-            mirrored_patches = {}
-            for key, patch in self.patches.items():
-                mirrored_patches[f"{key}_mirrored"] = MirroredPatch(patch, axis=axis)
+            mirrored_patches = {
+                f"{key}_mirrored": MirroredPatch(patch, axis=axis)
+                for key, patch in self.patches.items()
+            }
+
+            # Mirrored patches share the resolution of their parent
+            for res in (self.patch_res_r, self.patch_res_s):
+                res.update(
+                    {f"{key}_mirrored": res[key] for key in self.patches if key in res}
+                )
 
             if self._append_reflection:
                 # Append mirrored patches to original patches
-                for key, patch in mirrored_patches.items():
-                    self.patches[key] = patch
+                self.patches.update(mirrored_patches)
             else:
                 # Overwrite existing patches
                 self.patches = mirrored_patches
@@ -248,53 +282,75 @@ class Component(AbstractComponent):
                 njv=self.vtk_resolution,
             )
 
-    def surface(self, resolution: int = None):
-        stl_resolution = self.stl_resolution if resolution is None else resolution
-
+    def _surface_cases(self, stl_resolution) -> list:
+        """Returns the (key, patch, res_r, res_s, stations) tessellation
+        case of each parametric patch."""
         # Check for patches
         if len(self.patches) == 0:
             raise Exception(
                 "No patches have been generated. " + "Please call .generate_patches()."
             )
 
-        # Create case list
+        # Gather patch data into parallel sequences
+        keys = list(self.patches)
+        patches = list(self.patches.values())
         if isinstance(stl_resolution, int):
-            case_list = [
-                [k, patch, stl_resolution, stl_resolution]
-                for k, patch in self.patches.items()
-            ]
+            res_r = res_s = [stl_resolution] * len(keys)
         else:
-            case_list = [
-                [k, patch, self.patch_res_r[k], self.patch_res_r[k]]
-                for k, patch in self.patches.items()
-            ]
+            res_r = [self.patch_res_r[k] for k in keys]
+            res_s = [self.patch_res_s[k] for k in keys]
+
+        # Get tessellation stations, shared between patches of equal resolution
+        clustering = tuple(self._clustering.items())
+        stations = []
+        for nr, ns in zip(res_r, res_s):
+            cache_key = (nr, ns, clustering)
+            if cache_key not in self._eval_cache:
+                self._eval_cache[cache_key] = surface_stations(
+                    nr, ns, **self._clustering
+                )
+            stations.append(self._eval_cache[cache_key])
+
+        return list(zip(keys, patches, res_r, res_s, stations))
 
-        # Prepare multiprocessing arguments iterable
-        def wrapper(key: str, patch, res_r: int, res_s: int):
-            surface = surfce_to_stl(patch, res_r, res_s, **self._clustering)
-            return surface
+    def surface(self, resolution: int = None, multiprocess: Optional[bool] = None):
+        """Creates the STL surfaces of each parametric patch.
+
+        Parameters
+        ----------
+        resolution : int, optional
+            The STL resolution to use. If None, the component stl_resolution
+            will be used. The default is None.
+
+        multiprocess : bool, optional
+            Generate the patch surfaces concurrently. This is only used when
+            the component has at least MIN_MULTIPROCESS_PATCHES patches. If
+            None, the component setting will be used. The default is None.
+        """
+        stl_resolution = self.stl_resolution if resolution is None else resolution
+        multiprocess = self._multiprocess if multiprocess is None else multiprocess
+
+        case_list = self._surface_cases(stl_resolution)
 
         self.surfaces = {}
-        multiprocess = False  # flag to disable multiprocessing for debugging
-        # TODO - move multiprocess to arg / config option
-        if multiprocess is True:
-            # Initialise surfaces and pool
-            pool = mp.Pool()
-
-            # Submit tasks
-            print(f"START: Creating stl - multiprocessor run.")
-            for result in pool.starmap(wrapper, case_list):
-                self.surfaces[result[0]] = result[1]
-            print("  DONE: Creating stl - multiprocess.")
+        if multiprocess and len(case_list) >= MIN_MULTIPROCESS_PATCHES:
+            # Submit tasks to pool
+            if self.verbosity > 0:
+                print(f"START: Creating stl - multiprocessor run.")
+            with mp.Pool() as pool:
+                for key, surface in pool.starmap(_patch_surface, case_list):
+                    self.surfaces[key] = surface
+            if self.verbosity > 0:
+                print("  DONE: Creating stl - multiprocess.")
 
         else:
             for case in case_list:
-                k = case[0]
-                pat = case[1]
-                print(f"START: Creating stl for '{k}'.")
-                result = wrapper(k, pat, case[2], case[3])
-                self.surfaces[result[0]] = result[1]
-                print("  DONE: Creating stl.")
+                if self.verbosity > 1:
+                    print(f"START: Creating stl for '{case[0]}'.")
+                key, surface = _patch_surface(*case)
+                self.surfaces[key] = surface
+                if self.verbosity > 1:
+                    print("  DONE: Creating stl.")
 
     def to_vtk(self):
         raise NotImplementedError("This method has not been implemented yet.")
@@ -319,6 +375,50 @@ class Component(AbstractComponent):
                 # Clean it
                 pymeshfix.clean_from_file(outfile, outfile)
 
+    def to_stl_streaming(self, outfile: str):
+        """Writes the component to a binary STL file one patch at a time,
+        without assembling the component mesh. Patch surfaces are
+        generated as they are written, unless they already exist.
+
+        Parameters
+        ----------
+        outfile : str
+            The STL file to write to.
+        """
+        if self._ghost:
+            return
+
+        if self.verbosity > 1:
+            print("Streaming patches to STL format. ")
+            print(f"Output file = {outfile}.")
+
+        if self.surfaces is not None:
+            surfaces = self.surfaces.values()
+        else:
+            surfaces = (
+                _patch_surface(*case)[1]
+                for case in self._surface_cases(self.stl_resolution)
+            )
+
+        with open(outfile, "wb") as f:
+            # Write header and placeholder triangle count
+            header = f"hypervehicle {self}".encode()[:80]
+            f.write(header.ljust(80, b" "))
+            f.write(struct.pack("<I", 0))
+
+            n_triangles = 0
+            for surface in surfaces:
+                surface.update_normals()
+                surface.data.tofile(f)
+                n_triangles += surface.data.shape[0]
+
+            # Write triangle count
+            f.seek(80)
+            f.write(struct.pack("<I", n_triangles))
+
+        # Clean it
+        pymeshfix.clean_from_file(outfile, outfile)
+
     def analyse(self):
         # Get mass properties
         volume, cog, inertia = self.mesh.get_mass_properties()
@@ -276,7 +276,7 @@ class Fin(Component):
 
         # Rotate patch into x-z plane about p3
         bottom_ellipse_patch = RotatedPatch(
-            temp_bottom_ellipse_patch, np.deg2rad(-90), axis="z", point=p3
+            temp_bottom_ellipse_patch, -np.pi / 2, axis="z", point=p3
         )
 
         # Create rectangular patches for rest of fin bottom
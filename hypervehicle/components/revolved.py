@@ -1,5 +1,5 @@
 import numpy as np
-from hypervehicle.geometry import RevolvedPatch
+from hypervehicle.geometry import RevolvedPatch, CachedPath, PATH_CACHE_SIZE
 from hypervehicle.components.component import Component
 from hypervehicle.components.constants import REVOLVED_COMPONENT
 
@@ -25,7 +25,11 @@ class RevolvedComponent(Component):
         super().__init__(stl_resolution=stl_resolution, verbosity=verbosity, name=name)
 
     def generate_patches(self):
+        # Share revolve line evaluations between the four quadrants, keeping
+        # every station along the line
+        maxsize = max(PATH_CACHE_SIZE, self.stl_resolution + 1)
+        line = CachedPath(self.revolve_line, maxsize=maxsize)
         for i in range(4):
             self.patches[f"revolved_fuse_{i}"] = RevolvedPatch(
-                self.revolve_line, i * np.pi / 2, (i + 1) * np.pi / 2
+                line, i * np.pi / 2, (i + 1) * np.pi / 2
             )
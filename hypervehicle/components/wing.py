@@ -566,7 +566,7 @@ class Wing(Component):
 
         # Rotate patch
         interior_ellip = RotatedPatch(
-            interior_ellip, np.deg2rad(-90), axis="z", point=TT_mid
+            interior_ellip, -np.pi / 2, axis="z", point=TT_mid
         )
 
         # Append to patch_dict
@@ -1,3 +1,4 @@
+import math
 import numpy as np
 from gdtk.geom.vector3 import Vector3
 from gdtk.geom.path import Line, Path, ArcLengthParameterizedPath
@@ -7,6 +8,133 @@ from gdtk.geom.surface import CoonsPatch, ParametricSurface
 from gdtk.geom.vector3 import Vector3
 from gdtk.geom.path import Bezier, Line, Polyline, Arc, Spline
 from gdtk.geom.cluster import RobertsFunction
+from functools import lru_cache, partial
+from typing import Callable, Optional
+
+# Maximum number of grid points evaluated at once by vectorized surfaces
+TILE_POINTS = 1024
+
+# Default number of parameter values memoized on each cached path. Paths
+# evaluated at more stations than this, in order, will not share any
+# evaluations, so should be given a larger maxsize
+PATH_CACHE_SIZE = 1024
+
+# Vectorized evaluators registered for parametric surface types
+_VECTORIZED_EVALUATORS = {}
+
+
+def register_vectorized(surface_type: type, evaluator: Callable):
+    """Registers a vectorized evaluator for a type of parametric surface.
+
+    Registered evaluators take precedence over a surface's own vectorized
+    method, allowing a faster kernel (for example, one compiled with
+    Numba) to be supplied for a surface type without modifying it.
+
+    Parameters
+    ----------
+    surface_type : type
+        The parametric surface class. Subclasses will also use the
+        evaluator, unless they are registered themselves.
+
+    evaluator : Callable
+        A function evaluator(surface, r, s), which evaluates the surface
+        over arrays of r and s, returning an array of shape r.shape + (3,).
+    """
+    _VECTORIZED_EVALUATORS[surface_type] = evaluator
+
+
+def vectorized_evaluator(parametric_surface) -> Optional[Callable]:
+    """Returns a function evaluating the parametric surface over arrays of
+    r and s, or None if the surface can only be evaluated point by point.
+    See register_vectorized.
+    """
+    for surface_type in type(parametric_surface).__mro__:
+        if surface_type in _VECTORIZED_EVALUATORS:
+            return partial(_VECTORIZED_EVALUATORS[surface_type], parametric_surface)
+    return getattr(parametric_surface, "vectorized", None)
+
+
+def _evaluate_tiles(
+    evaluate: Callable,
+    r_list: np.ndarray,
+    s_list: np.ndarray,
+    out: np.ndarray,
+    max_points: int = TILE_POINTS,
+):
+    """Evaluates a vectorized parametric surface evaluator over the (r, s)
+    grid into out, recursively bisecting the grid until each tile has at
+    most max_points points. This keeps the working set of large grids
+    small, without having to tune a tile size.
+    """
+    ni = len(r_list)
+    nj = len(s_list)
+    if ni * nj <= max_points or (ni == 1 and nj == 1):
+        # Evaluate tile
+        r_grid, s_grid = np.meshgrid(r_list, s_list, indexing="ij")
+        out[...] = evaluate(r_grid, s_grid)
+
+    elif ni >= nj:
+        # Split along r
+        h = ni // 2
+        _evaluate_tiles(evaluate, r_list[:h], s_list, out[:h], max_points)
+        _evaluate_tiles(evaluate, r_list[h:], s_list, out[h:], max_points)
+
+    else:
+        # Split along s
+        h = nj // 2
+        _evaluate_tiles(evaluate, r_list, s_list[:h], out[:, :h], max_points)
+        _evaluate_tiles(evaluate, r_list, s_list[h:], out[:, h:], max_points)
+
+
+def evaluate_grid(surface, evaluate: Callable, r_list, s_list, out: np.ndarray):
+    """Evaluates a parametric surface over the (r, s) grid into out, using
+    its vectorized evaluator.
+    """
+    _evaluate_tiles(evaluate, r_list, s_list, out)
+    return out
+
+
+def _cube_face_coordinates(face, r, s):
+    """Returns the (x, y, z) coordinates of arrays of r and s on a face
+    of the unit cube [-1, 1]^3."""
+    r = np.asarray(r, dtype=float)
+    s = np.asarray(s, dtype=float)
+    u = -1.0 + 2.0 * r
+    v = -1.0 + 2.0 * s
+    if face == "east":
+        return np.full(r.shape, 1.0), u, v
+    elif face == "west":
+        return np.full(r.shape, -1.0), u, v
+    elif face == "south":
+        return u, np.full(r.shape, -1.0), v
+    elif face == "north":
+        return u, np.full(r.shape, 1.0), v
+    elif face == "bottom":
+        return u, v, np.full(r.shape, -1.0)
+    elif face == "top":
+        return u, v, np.full(r.shape, 1.0)
+    else:
+        raise ValueError(
+            "Incorrect face name."
+            + "Allowable faces are: east, west, south, north, bottom or top."
+        )
+
+
+def _evaluate_points(surface, r, s):
+    """Evaluates a parametric surface over arrays of r and s, returning
+    an array of shape r.shape + (3,). Surfaces without a vectorized
+    method are evaluated point by point."""
+    evaluate = vectorized_evaluator(surface)
+    if evaluate is not None:
+        return evaluate(r, s)
+
+    r = np.asarray(r, dtype=float)
+    s = np.asarray(s, dtype=float)
+    points = np.empty(r.shape + (3,))
+    for ix in np.ndindex(r.shape):
+        pos = surface(r[ix], s[ix])
+        points[ix] = pos.x, pos.y, pos.z
+    return points
 
 
 class SubRangedPath(Path):
@@ -42,6 +170,42 @@ class SubRangedPath(Path):
         return self.underlying_path.length()
 
 
+class CachedPath(Path):
+    """
+    A Path which memoizes evaluations of an underlying path, so that
+    patches sharing the path only evaluate it once per parameter value.
+    """
+
+    __slots__ = ["underlying_path", "_coordinates"]
+
+    def __init__(self, underlying_path, maxsize: int = PATH_CACHE_SIZE):
+        self.underlying_path = underlying_path
+        self._coordinates = lru_cache(maxsize=maxsize)(self._evaluate)
+
+    def __reduce__(self):
+        # The memoized evaluations are not pickled
+        maxsize = self._coordinates.cache_info().maxsize
+        return (CachedPath, (self.underlying_path, maxsize))
+
+    def __repr__(self) -> str:
+        return "CachedPath(underlying_path={})".format(self.underlying_path)
+
+    def __str__(self) -> str:
+        return "CachedPath"
+
+    def __call__(self, t):
+        # Return a new point, so callers cannot modify the memoized values
+        x, y, z = self._coordinates(t)
+        return Vector3(x=x, y=y, z=z)
+
+    def _evaluate(self, t):
+        pos = self.underlying_path(t)
+        return pos.x, pos.y, pos.z
+
+    def length(self):
+        return self.underlying_path.length()
+
+
 class ElipsePath(Path):
     """
     A path following a quarter elipse from a -> b, around c
@@ -158,7 +322,24 @@ class OffsetPatchFunction(ParametricSurface):
     def __call__(self, r, s):
         pos = self.underlying_surf(r, s)
         offset = self.function(pos.x, pos.y, pos.z)
-        return self.underlying_surf(r, s) + offset
+        return pos + offset
+
+    def vectorized(self, r, s):
+        """Evaluates the patch over arrays of r and s, returning an
+        array of shape r.shape + (3,)."""
+        points = _evaluate_points(self.underlying_surf, r, s)
+
+        if hasattr(self.function, "vectorized"):
+            offset = self.function.vectorized(
+                points[..., 0], points[..., 1], points[..., 2]
+            )
+        else:
+            offset = np.empty_like(points)
+            for ix in np.ndindex(points.shape[:-1]):
+                o = self.function(*points[ix].tolist())
+                offset[ix] = o.x, o.y, o.z
+
+        return points + offset
 
 
 class LeadingEdgePatchFunction(ParametricSurface):
@@ -511,6 +692,35 @@ class CurvedPatch(ParametricSurface):
             )
             return pos_new
 
+    def vectorized(self, r, s):
+        """Evaluates the patch over arrays of r and s, returning an
+        array of shape r.shape + (3,)."""
+        if self.fun == None or self.fun_dash == None:
+            raise Exception("Both 'fun' and 'fun_dash' need to be specified.")
+        pos = _evaluate_points(self.underlying_surf, r, s)
+        x, y, z = pos[..., 0], pos[..., 1], pos[..., 2]
+
+        if hasattr(self.fun, "vectorized") and hasattr(self.fun_dash, "vectorized"):
+            offset = self.fun.vectorized(x, y)
+            slope = self.fun_dash.vectorized(x, y)
+        else:
+            xy = list(zip(x.ravel().tolist(), y.ravel().tolist()))
+            offset = np.array([self.fun(*p) for p in xy], dtype=float)
+            slope = np.array([self.fun_dash(*p) for p in xy], dtype=float)
+            offset = offset.reshape(x.shape)
+            slope = slope.reshape(x.shape)
+
+        angle = np.arctan2(slope, 1)
+        if self.direction == "x":
+            return np.stack(
+                [x - z * np.sin(angle), y, z * np.cos(angle) + offset], axis=-1
+            )
+        if self.direction == "y":
+            return np.stack(
+                [x, y - z * np.sin(angle), offset + z * np.cos(angle)], axis=-1
+            )
+        raise ValueError(f"Unsupported curvature direction '{self.direction}'.")
+
 
 class ConePatch(ParametricSurface):
     """
@@ -533,17 +743,36 @@ class ConePatch(ParametricSurface):
 
     def __call__(self, r, s):
         angle = self.angle0 * (1 - s) + self.angle1 * s
+        cos_a = math.cos(angle)
+        sin_a = math.sin(angle)
         x0 = self.x0
-        y0 = self.r0 * np.cos(angle)
-        z0 = self.r0 * np.sin(angle)
+        y0 = self.r0 * cos_a
+        z0 = self.r0 * sin_a
         x1 = self.x1
-        y1 = self.r1 * np.cos(angle)
-        z1 = self.r1 * np.sin(angle)
+        y1 = self.r1 * cos_a
+        z1 = self.r1 * sin_a
         x = x0 * (1 - r) + x1 * r
         y = y0 * (1 - r) + y1 * r
         z = z0 * (1 - r) + z1 * r
         return Vector3(x=x, y=y, z=z)
 
+    def vectorized(self, r, s):
+        """Evaluates the patch over arrays of r and s, returning an
+        array of shape r.shape + (3,)."""
+        r = np.asarray(r, dtype=float)
+        s = np.asarray(s, dtype=float)
+
+        # Tabulate angular terms at each unique s station
+        s_stations, s_index = np.unique(s.ravel(), return_inverse=True)
+        angle = self.angle0 * (1 - s_stations) + self.angle1 * s_stations
+        cos_a = np.cos(angle)[s_index].reshape(s.shape)
+        sin_a = np.sin(angle)[s_index].reshape(s.shape)
+
+        x = self.x0 * (1 - r) + self.x1 * r
+        y = self.r0 * cos_a * (1 - r) + self.r1 * cos_a * r
+        z = self.r0 * sin_a * (1 - r) + self.r1 * sin_a * r
+        return np.stack([x, y, z], axis=-1)
+
 
 class RevolvedPatch(ParametricSurface):
     """Creates a path by revolving a line about a central
@@ -566,12 +795,39 @@ class RevolvedPatch(ParametricSurface):
         point = self.line(r)
 
         # Calculate points
+        cos_a = math.cos(angle)
+        sin_a = math.sin(angle)
         x = point.x
-        y = point.y * np.cos(angle) + point.z * np.sin(angle)
-        z = point.z * np.cos(angle) - point.y * np.sin(angle)
+        y = point.y * cos_a + point.z * sin_a
+        z = point.z * cos_a - point.y * sin_a
 
         return Vector3(x=x, y=y, z=z)
 
+    def vectorized(self, r, s):
+        """Evaluates the patch over arrays of r and s, returning an
+        array of shape r.shape + (3,)."""
+        r = np.asarray(r, dtype=float)
+        s = np.asarray(s, dtype=float)
+
+        # Tabulate line points at each unique r station
+        r_stations, r_index = np.unique(r.ravel(), return_inverse=True)
+        points = np.array([[p.x, p.y, p.z] for p in map(self.line, r_stations)])
+        points = points[r_index].reshape(r.shape + (3,))
+        px, py, pz = points[..., 0], points[..., 1], points[..., 2]
+
+        # Tabulate angular terms at each unique s station
+        s_stations, s_index = np.unique(s.ravel(), return_inverse=True)
+        angle = self.angle0 * (1 - s_stations) + self.angle1 * s_stations
+        cos_a = np.cos(angle)[s_index].reshape(s.shape)
+        sin_a = np.sin(angle)[s_index].reshape(s.shape)
+
+        # Calculate points
+        x = px
+        y = py * cos_a + pz * sin_a
+        z = pz * cos_a - py * sin_a
+
+        return np.stack([x, y, z], axis=-1)
+
 
 class BluntConePatch(ParametricSurface):
     """
@@ -605,12 +861,14 @@ class BluntConePatch(ParametricSurface):
 
     def __call__(self, r, s):
         angle = self.angle0 * (1 - s) + self.angle1 * s
+        cos_a = math.cos(angle)
+        sin_a = math.sin(angle)
         x0 = self.x0
-        y0 = self.r0 * np.cos(angle)
-        z0 = self.r0 * np.sin(angle)
+        y0 = self.r0 * cos_a
+        z0 = self.r0 * sin_a
         x1 = self.x1
-        y1 = self.r1 * np.cos(angle)
-        z1 = self.r1 * np.sin(angle)
+        y1 = self.r1 * cos_a
+        z1 = self.r1 * sin_a
         x = x0 * (1 - r) + x1 * r
         y = y0 * (1 - r) + y1 * r
         z = z0 * (1 - r) + z1 * r
@@ -725,7 +983,20 @@ class RotatedPatch(ParametricSurface):
     Rotates a surface about a point in an axis-specified direction.
     """
 
-    __slots__ = ["underlying_surf", "angle", "axis", "point"]
+    __slots__ = [
+        "underlying_surf",
+        "angle",
+        "axis",
+        "point",
+        "_cos",
+        "_sin",
+        "_plane",
+        "_point_array",
+    ]
+
+    # Indices of the coordinates (a, b) rotated about each axis, such that
+    # a' = a cos - b sin and b' = a sin + b cos
+    _ROTATION_PLANES = {"x": (1, 2), "y": (2, 0), "z": (0, 1)}
 
     def __init__(self, underlying_surf, angle, axis="x", point=Vector3(x=0, y=0, z=0)):
         self.underlying_surf = underlying_surf
@@ -733,39 +1004,93 @@ class RotatedPatch(ParametricSurface):
         self.axis = axis.lower()
         self.point = point
 
+        # Rotation matrix terms
+        self._cos = np.cos(angle)
+        self._sin = np.sin(angle)
+
+        # Vectorized evaluation terms
+        self._plane = self._ROTATION_PLANES.get(self.axis)
+        self._point_array = np.array([point.x, point.y, point.z])
+
     def __repr__(self):
         str = f" (rotated by {np.rad2deg(self.angle)} degrees)"
         return self.underlying_surf.__repr__() + str
 
+    @classmethod
+    def compose(
+        cls, underlying_surf, angle, axis="x", point=Vector3(x=0, y=0, z=0)
+    ) -> ParametricSurface:
+        """Rotates a surface, merging the rotation into the underlying
+        surface if it is already rotated about the same axis and point.
+        Rotations by zero return the surface unchanged.
+        """
+        axis = axis.lower()
+        if (
+            isinstance(underlying_surf, RotatedPatch)
+            and underlying_surf.axis == axis
+            and (
+                underlying_surf.point.x,
+                underlying_surf.point.y,
+                underlying_surf.point.z,
+            )
+            == (point.x, point.y, point.z)
+        ):
+            # Combine with existing rotation
+            angle = underlying_surf.angle + angle
+            underlying_surf = underlying_surf.underlying_surf
+
+        if angle == 0:
+            return underlying_surf
+
+        return cls(underlying_surf, angle, axis=axis, point=point)
+
     def __call__(self, r, s):
         pos = self.underlying_surf(r, s) - self.point
+        cos, sin = self._cos, self._sin
 
         if self.axis == "x":
             x = pos.x
-            y = pos.y * np.cos(self.angle) - pos.z * np.sin(self.angle)
-            z = pos.y * np.sin(self.angle) + pos.z * np.cos(self.angle)
+            y = pos.y * cos - pos.z * sin
+            z = pos.y * sin + pos.z * cos
         elif self.axis == "y":
-            x = pos.x * np.cos(self.angle) + pos.z * np.sin(self.angle)
+            x = pos.x * cos + pos.z * sin
             y = pos.y
-            z = -pos.x * np.sin(self.angle) + pos.z * np.cos(self.angle)
+            z = -pos.x * sin + pos.z * cos
 
         elif self.axis == "z":
-            x = pos.x * np.cos(self.angle) - pos.y * np.sin(self.angle)
-            y = pos.x * np.sin(self.angle) + pos.y * np.cos(self.angle)
+            x = pos.x * cos - pos.y * sin
+            y = pos.x * sin + pos.y * cos
             z = pos.z
 
         return Vector3(x=x, y=y, z=z) + self.point
 
+    def vectorized(self, r, s):
+        """Evaluates the patch over arrays of r and s, returning an
+        array of shape r.shape + (3,)."""
+        pos = _evaluate_points(self.underlying_surf, r, s) - self._point_array
+
+        # Rotate the coordinates in the plane normal to the axis
+        i, j = self._plane
+        a = pos[..., i].copy()
+        b = pos[..., j]
+        pos[..., i] = a * self._cos - b * self._sin
+        pos[..., j] = a * self._sin + b * self._cos
+
+        return pos + self._point_array
+
 
 class MirroredPatch(ParametricSurface):
     """Mirrors a surface in an axis-specified direction."""
 
-    __slots__ = ["underlying_surf", "mirror_axis"]
+    __slots__ = ["underlying_surf", "axis", "_scale"]
 
     def __init__(self, underlying_surf, axis="x"):
         self.underlying_surf = underlying_surf
         self.axis = axis.lower()
 
+        # Coordinate scale factors for vectorized evaluation
+        self._scale = np.array([-1.0 if a == self.axis else 1.0 for a in "xyz"])
+
     def __repr__(self):
         return self.underlying_surf.__repr__() + f" mirrored along {self.axis}-axis"
 
@@ -786,6 +1111,11 @@ class MirroredPatch(ParametricSurface):
 
         return Vector3(x=x, y=y, z=z)
 
+    def vectorized(self, r, s):
+        """Evaluates the patch over arrays of r and s, returning an
+        array of shape r.shape + (3,)."""
+        return _evaluate_points(self.underlying_surf, r, s) * self._scale
+
 
 class CubePatch(ParametricSurface):
     """Creates a cube face patch for a cube of length
@@ -842,6 +1172,15 @@ class CubePatch(ParametricSurface):
 
         return Vector3(x=x_cube, y=y_cube, z=z_cube)
 
+    def vectorized(self, r, s):
+        """Evaluates the patch over arrays of r and s, returning an
+        array of shape r.shape + (3,)."""
+        x, y, z = _cube_face_coordinates(self.face, r, s)
+        x_cube = x * self.a + self.centre.x
+        y_cube = y * self.a + self.centre.y
+        z_cube = z * self.a + self.centre.z
+        return np.stack([x_cube, y_cube, z_cube], axis=-1)
+
 
 class SpherePatch(ParametricSurface):
     """Creates a sphere face patch for a cube of length
@@ -906,6 +1245,19 @@ class SpherePatch(ParametricSurface):
 
         return Vector3(x=x_sphere, y=y_sphere, z=z_sphere)
 
+    def vectorized(self, r, s):
+        """Evaluates the patch over arrays of r and s, returning an
+        array of shape r.shape + (3,)."""
+        x, y, z = _cube_face_coordinates(self.face, r, s)
+        x_dash = x * np.sqrt(1.0 - 0.5 * z * z - 0.5 * y * y + y * y * z * z / 3.0)
+        y_dash = y * np.sqrt(1.0 - 0.5 * z * z - 0.5 * x * x + x * x * z * z / 3.0)
+        z_dash = z * np.sqrt(1.0 - 0.5 * y * y - 0.5 * x * x + x * x * y * y / 3.0)
+
+        x_sphere = x_dash * self.r + self.centre.x
+        y_sphere = y_dash * self.r + self.centre.y
+        z_sphere = z_dash * self.r + self.centre.z
+        return np.stack([x_sphere, y_sphere, z_sphere], axis=-1)
+
 
 class SurfacePerimeter(Path):
     """Returns a path corresponding to the perimiter of an underlying
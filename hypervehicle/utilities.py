@@ -2,16 +2,39 @@ import re
 import os
 import sys
 import glob
+import copy
+import hashlib
+import itertools
 import numpy as np
+import multiprocess as mp
 import pandas as pd
 from stl import mesh
-from tqdm import tqdm
+from scipy.spatial import cKDTree
+from functools import lru_cache
 from art import tprint, art
-import xml.etree.ElementTree as ET
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+from hypervehicle.geometry import evaluate_grid, vectorized_evaluator
 
+try:
+    # Prefer libxml2 for parsing large .tri files
+    from lxml import etree as ET
 
-def surfce_to_stl(
+    _XML_PARSER = ET.XMLParser(huge_tree=True)
+
+except ModuleNotFoundError:
+    import xml.etree.ElementTree as ET
+
+    _XML_PARSER = None
+
+# Maximum number of meshes with cached mass properties
+MASS_PROPERTIES_CACHE_SIZE = 128
+_MASS_PROPERTIES_CACHE = {}
+
+# Maximum number of parameter sets with geometry cached by a sensitivity study
+SENSITIVITY_CACHE_SIZE = 4
+
+
+def surfce_to_vectors(
     parametric_surface,
     triangles_per_edge_r: int,
     triangles_per_edge_s: int,
@@ -21,10 +44,12 @@ def surfce_to_stl(
     i_clustering_func: callable = None,
     j_clustering_func: callable = None,
     verbosity=0,
-) -> mesh.Mesh:
+    stations: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
     """
-    Function to convert parametric_surface generated using the Eilmer Geometry
-    Package into a stl mesh object.
+    Function to tessellate parametric_surface generated using the Eilmer
+    Geometry Package into an array of triangle vertices.
 
     Parameters
     ----------
@@ -54,10 +79,20 @@ def surfce_to_stl(
             A custom clustering function to apply in the j direction.
             The default is None.
 
+        stations : Tuple[np.ndarray, np.ndarray], optional
+            Precomputed (r, s) stations of the grid, as returned by
+            surface_stations. When provided, the clustering options are
+            not used. The default is None.
+
+        out : np.ndarray, optional
+            A (4 * triangles_per_edge_r * triangles_per_edge_s, 3, 3) array
+            to write the triangles to. The default is None, in which case
+            a new float32 array is allocated.
+
     Returns
     ----------
-    stl_mesh : Mesh
-        The numpy-stl mesh.
+    vectors : np.ndarray
+        The vertices of each triangle, in the STL precision.
     """
     ni = triangles_per_edge_r
     nj = triangles_per_edge_s
@@ -66,15 +101,11 @@ def surfce_to_stl(
         print(f"Triangles per edge: (ni, nj) = ({ni}, {nj})")
 
     # Create list of vertices
-    if i_clustering_func:
-        r_list = [i_clustering_func(i) for i in np.linspace(0, 1, ni + 1)]
-    else:
-        r_list = default_vertex_func(lb=0.0, ub=1.0, steps=ni + 1, spacing=si)
-
-    if j_clustering_func:
-        s_list = [j_clustering_func(i) for i in np.linspace(0, 1, ni + 1)]
-    else:
-        s_list = default_vertex_func(lb=0.0, ub=1.0, steps=nj + 1, spacing=sj)
+    if stations is None:
+        stations = surface_stations(
+            ni, nj, si, sj, i_clustering_func, j_clustering_func
+        )
+    r_list, s_list = stations
 
     y_mult: int = -1 if mirror_y else 1
 
@@ -82,6 +113,24 @@ def surfce_to_stl(
         print(f"r_list = {r_list}")
         print(f"s_list = {s_list}")
 
+    # Evaluate the surface once at each vertex of the (r, s) grid
+    evaluate = vectorized_evaluator(parametric_surface)
+    if evaluate is not None:
+        # Surface supports batched evaluation over tiles of the grid
+        vertices = np.empty((len(r_list), len(s_list), 3))
+        evaluate_grid(parametric_surface, evaluate, r_list, s_list, vertices)
+    else:
+        vertices = np.array(
+            [
+                [(p.x, p.y, p.z) for p in (parametric_surface(r, s) for s in s_list)]
+                for r in r_list
+            ],
+            dtype=float,
+        )
+
+    # Apply mirroring
+    vertices[..., 1] *= y_mult
+
     # For stl generation we split each cell into 4x triangles with indece [0, 3]
     #   p01-------p11
     #    | \  2  / |
@@ -91,53 +140,163 @@ def surfce_to_stl(
     #    |  /  0  \ |
     #   p00-------p10
 
-    N_triangles = 4 * (ni) * (nj)
-    stl_mesh = mesh.Mesh(np.zeros(N_triangles, dtype=mesh.Mesh.dtype))
-    # mesh.vectors contains a list defining three corners of each triangle.
-    t = 0
-    # For vertices along the x direction (i)
-    for i in range(ni):
-        # For vertices along the y direction (j)
-        for j in range(nj):
-            # get corner points for current cell (quad)
-            pos00 = parametric_surface(r_list[i], s_list[j])
-            pos10 = parametric_surface(r_list[i + 1], s_list[j])
-            pos01 = parametric_surface(r_list[i], s_list[j + 1])
-            pos11 = parametric_surface(r_list[i + 1], s_list[j + 1])
-            # get centre for current cell (quad)
-            pos_x = 0.25 * (pos00.x + pos10.x + pos01.x + pos11.x)
-            pos_y = 0.25 * (pos00.y + pos10.y + pos01.y + pos11.y)
-            pos_z = 0.25 * (pos00.z + pos10.z + pos01.z + pos11.z)
-
-            # add triangle 0 [p00, p10, pc]
-            stl_mesh.vectors[t][0] = np.array([pos00.x, y_mult * pos00.y, pos00.z])
-            stl_mesh.vectors[t][1] = np.array([pos10.x, y_mult * pos10.y, pos10.z])
-            stl_mesh.vectors[t][2] = np.array([pos_x, y_mult * pos_y, pos_z])
-            t += 1
-            # add triangle 1 [p10, p11, pc]
-            stl_mesh.vectors[t][0] = np.array([pos10.x, y_mult * pos10.y, pos10.z])
-            stl_mesh.vectors[t][1] = np.array([pos11.x, y_mult * pos11.y, pos11.z])
-            stl_mesh.vectors[t][2] = np.array([pos_x, y_mult * pos_y, pos_z])
-            t += 1
-            # add triangle 2 [p11, p01, pc]
-            stl_mesh.vectors[t][0] = np.array([pos11.x, y_mult * pos11.y, pos11.z])
-            stl_mesh.vectors[t][1] = np.array([pos01.x, y_mult * pos01.y, pos01.z])
-            stl_mesh.vectors[t][2] = np.array([pos_x, y_mult * pos_y, pos_z])
-            t += 1
-            # add triangle 3 [p01, p00, pc]
-            stl_mesh.vectors[t][0] = np.array([pos01.x, y_mult * pos01.y, pos01.z])
-            stl_mesh.vectors[t][1] = np.array([pos00.x, y_mult * pos00.y, pos00.z])
-            stl_mesh.vectors[t][2] = np.array([pos_x, y_mult * pos_y, pos_z])
-            t += 1
+    # Vertex buffer of grid points followed by cell centres, quantized once
+    # to the STL precision
+    n_points = (ni + 1) * (nj + 1)
+    points = np.empty((n_points + ni * nj, 3), dtype=mesh.Mesh.dtype["vectors"].base)
+    points[:n_points] = vertices.reshape(-1, 3)
+
+    # Centre point of every cell (quad), computed at full precision
+    np.multiply(
+        0.25,
+        vertices[:-1, :-1] + vertices[1:, :-1] + vertices[:-1, 1:] + vertices[1:, 1:],
+        out=points[n_points:].reshape(ni, nj, 3),
+    )
+
+    # Gather the triangles of each cell
+    faces = _triangle_faces(ni, nj)
+    if out is None:
+        out = np.empty((len(faces), 3, 3), dtype=points.dtype)
+    np.take(points, faces, axis=0, out=out)
+
+    return out
+
+
+def surfce_to_stl(
+    parametric_surface,
+    triangles_per_edge_r: int,
+    triangles_per_edge_s: int,
+    si: float = 1.0,
+    sj: float = 1.0,
+    mirror_y=False,
+    i_clustering_func: callable = None,
+    j_clustering_func: callable = None,
+    verbosity=0,
+    stations: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> mesh.Mesh:
+    """
+    Function to convert parametric_surface generated using the Eilmer Geometry
+    Package into a stl mesh object. See surfce_to_vectors for a description
+    of the parameters.
+
+    Returns
+    ----------
+    stl_mesh : Mesh
+        The numpy-stl mesh.
+    """
+    # Tessellate straight into the mesh data
+    data = np.zeros(
+        4 * triangles_per_edge_r * triangles_per_edge_s, dtype=mesh.Mesh.dtype
+    )
+    surfce_to_vectors(
+        parametric_surface,
+        triangles_per_edge_r,
+        triangles_per_edge_s,
+        si,
+        sj,
+        mirror_y,
+        i_clustering_func,
+        j_clustering_func,
+        verbosity,
+        stations,
+        out=data["vectors"],
+    )
+
+    stl_mesh = mesh.Mesh(data, calculate_normals=False)
+
     return stl_mesh
 
 
+@lru_cache(maxsize=32)
+def _triangle_faces(ni: int, nj: int) -> np.ndarray:
+    """Returns the (4 * ni * nj, 3) vertex indices of the triangles used
+    to tessellate an (ni, nj) cell grid. Vertices are indexed as the
+    (ni + 1, nj + 1) grid points in C order, followed by the (ni, nj)
+    cell centres. The triangles [p00, p10, pc], [p10, p11, pc],
+    [p11, p01, pc] and [p01, p00, pc] of each cell are ordered by
+    cell (i, j). The returned array is cached, and so is read-only.
+    """
+    # Use 32-bit indices unless the vertex count needs more
+    n_points = (ni + 1) * (nj + 1) + ni * nj
+    dtype = np.int32 if n_points <= np.iinfo(np.int32).max else np.int64
+
+    i, j = np.meshgrid(
+        np.arange(ni, dtype=dtype), np.arange(nj, dtype=dtype), indexing="ij"
+    )
+    p00 = i * (nj + 1) + j
+    p10 = p00 + (nj + 1)
+    p01 = p00 + 1
+    p11 = p10 + 1
+    pc = (ni + 1) * (nj + 1) + i * nj + j
+
+    faces = np.stack(
+        [
+            np.stack([p00, p10, pc], axis=-1),
+            np.stack([p10, p11, pc], axis=-1),
+            np.stack([p11, p01, pc], axis=-1),
+            np.stack([p01, p00, pc], axis=-1),
+        ],
+        axis=2,
+    )
+    faces = faces.reshape(-1, 3)
+    faces.flags.writeable = False
+    return faces
+
+
+def surface_stations(
+    triangles_per_edge_r: int,
+    triangles_per_edge_s: int,
+    si: float = 1.0,
+    sj: float = 1.0,
+    i_clustering_func: callable = None,
+    j_clustering_func: callable = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the parametric r and s stations of the grid used to
+    tessellate a surface. See surfce_to_vectors for a description of the
+    parameters.
+    """
+    ni = triangles_per_edge_r
+    nj = triangles_per_edge_s
+
+    if i_clustering_func:
+        r_list = np.array([i_clustering_func(i) for i in np.linspace(0, 1, ni + 1)])
+    else:
+        r_list = default_vertex_func(lb=0.0, ub=1.0, steps=ni + 1, spacing=si)
+
+    if j_clustering_func:
+        s_list = np.array([j_clustering_func(i) for i in np.linspace(0, 1, nj + 1)])
+    else:
+        s_list = default_vertex_func(lb=0.0, ub=1.0, steps=nj + 1, spacing=sj)
+
+    return r_list, s_list
+
+
 def default_vertex_func(lb, ub, steps, spacing=1.0):
     span = ub - lb
     dx = 1.0 / (steps - 1)
     return np.array([lb + (i * dx) ** spacing * span for i in range(steps)])
 
 
+def _mass_properties(stl_mesh: mesh.Mesh, density: float) -> tuple:
+    """Returns the volume, mass, CoG and inertia of a mesh with the given
+    density. Results are cached by mesh content, so that components which
+    are unchanged between calls (for example, in sensitivity studies) are
+    not re-evaluated.
+    """
+    vectors = np.ascontiguousarray(stl_mesh.vectors)
+    key = (density, vectors.shape, hashlib.blake2b(vectors).digest())
+    try:
+        volume, vmass, cog, inertia = _MASS_PROPERTIES_CACHE[key]
+    except KeyError:
+        volume, vmass, cog, inertia = stl_mesh.get_mass_properties_with_density(density)
+        if len(_MASS_PROPERTIES_CACHE) >= MASS_PROPERTIES_CACHE_SIZE:
+            # Discard the oldest entry
+            del _MASS_PROPERTIES_CACHE[next(iter(_MASS_PROPERTIES_CACHE))]
+        _MASS_PROPERTIES_CACHE[key] = (volume, vmass, cog, inertia)
+
+    return volume, vmass, cog.copy(), inertia.copy()
+
+
 def assess_inertial_properties(vehicle, component_densities: Dict[str, float]):
     """
 
@@ -165,43 +324,29 @@ def assess_inertial_properties(vehicle, component_densities: Dict[str, float]):
     if not vehicle._generated:
         vehicle.generate()
 
-    volumes = {}
-    masses = {}
-    cgs = {}
-    inertias = {}
+    # Per-component properties, in component order
+    names = list(vehicle._named_components)
+    V = np.empty(len(names))
+    M = np.empty(len(names))
+    C = np.empty((len(names), 3))
+    I = np.empty((len(names), 3, 3))
     total_mass = 0
     total_volume = 0
 
-    for name, component in vehicle._named_components.items():
-        inertia_handle = getattr(component.mesh, "get_mass_properties_with_density")
-
-        volume, vmass, cog, inertia = inertia_handle(component_densities[name])
-
-        volumes[name] = volume
-        masses[name] = vmass
-        cgs[name] = cog
-        inertias[name] = inertia
-        total_mass += vmass
-        total_volume += volume
+    for i, (name, component) in enumerate(vehicle._named_components.items()):
+        V[i], M[i], C[i], I[i] = _mass_properties(
+            component.mesh, component_densities[name]
+        )
+        total_mass += M[i]
+        total_volume += V[i]
 
     # Composite centre of mass
-    composite_cog = 0
-    for component in vehicle._named_components:
-        m = masses[component]
-        composite_cog += m * cgs[component]
-
+    composite_cog = (M[:, None] * C).sum(axis=0)
     composite_cog *= 1 / total_mass
 
     # Parallel axis theorem
-    shifted_inertias = {}
-    composite_inertia = 0
-    for component in vehicle._named_components:
-        m = masses[component]
-        r = cgs[component] - composite_cog
-        I_adj = inertias[component] + m * r**2
-
-        shifted_inertias[component] = I_adj
-        composite_inertia += I_adj
+    r = C - composite_cog
+    composite_inertia = (I + M[:, None, None] * (r**2)[:, None, :]).sum(axis=0)
 
     # Prepare output
     vehicle_properties = {
@@ -211,10 +356,10 @@ def assess_inertial_properties(vehicle, component_densities: Dict[str, float]):
         "moi": composite_inertia,
     }
     component_properties = {
-        "mass": masses,
-        "volume": volumes,
-        "cog": cgs,
-        "moi": inertias,
+        "mass": dict(zip(names, M)),
+        "volume": dict(zip(names, V)),
+        "cog": dict(zip(names, C)),
+        "moi": dict(zip(names, I)),
     }
 
     return vehicle_properties, component_properties
@@ -225,7 +370,12 @@ class SensitivityStudy:
     Computes the geometric sensitivities using finite differencing.
     """
 
-    def __init__(self, vehicle_constructor, verbosity: Optional[int] = 1):
+    def __init__(
+        self,
+        vehicle_constructor,
+        verbosity: Optional[int] = 1,
+        cache_geometry: Optional[bool] = False,
+    ):
         """Vehicle geometry sensitivity constructor.
 
         Parameters
@@ -236,6 +386,12 @@ class SensitivityStudy:
         verbosity : int, optional
             The code verbosity. The default is 1.
 
+        cache_geometry : bool, optional
+            Keep the nominal and perturbed geometries generated by dvdp for
+            the last SENSITIVITY_CACHE_SIZE parameter sets, so that repeated
+            calls with the same parameters do not regenerate them. The
+            default is False.
+
         Returns
         -------
         VehicleSensitivity object.
@@ -253,6 +409,11 @@ class SensitivityStudy:
         # Nominal vehicle instance
         self.nominal_vehicle_instance = None
 
+        # Generated nominal instances and perturbed geometries, keyed by
+        # their parameters, to reuse across calls to dvdp
+        self.cache_geometry = cache_geometry
+        self._geometry_cache = {}
+
         # Combined data file name
         self.combined_fn = "all_components_sensitivity.csv"
 
@@ -266,6 +427,7 @@ class SensitivityStudy:
         perturbation: Optional[float] = 5,
         write_nominal_stl: Optional[bool] = True,
         nominal_stl_prefix: Optional[str] = None,
+        multiprocess: Optional[bool] = False,
     ):
         """Computes the sensitivity of the geometry with respect to the
         parameters.
@@ -296,6 +458,10 @@ class SensitivityStudy:
             The prefix to append when writing STL files for the nominal geometry.
             If None, no prefix will be used. The default is None.
 
+        multiprocess : bool, optional
+            Generate the perturbed geometries of each parameter
+            concurrently. The default is False.
+
         Returns
         -------
         sensitivities : dict
@@ -313,19 +479,31 @@ class SensitivityStudy:
 
         # Check overrides
         overrides = overrides if overrides else {}
+        key = self._instance_key(parameter_dict, overrides)
+        cached = self._geometry_cache.pop(key, None)
+        if cached is None:
+            cached = {"nominal": None, "perturbed": {}}
 
         # Create Vehicle instance with nominal parameters
         if self.verbosity > 0:
             print("  Generating nominal geometry...")
 
-        constructor_instance: AbstractGenerator = self.vehicle_constructor(
-            **parameter_dict, **overrides
-        )
-        nominal_instance = constructor_instance.create_instance()
-        nominal_instance.verbosity = 0
+        if cached["nominal"] is not None:
+            # Reuse a copy of the previously generated nominal geometry
+            nominal_instance = copy.deepcopy(cached["nominal"])
+
+        else:
+            constructor_instance: AbstractGenerator = self.vehicle_constructor(
+                **parameter_dict, **overrides
+            )
+            nominal_instance = constructor_instance.create_instance()
+            nominal_instance.verbosity = 0
+
+            # Generate components
+            nominal_instance.generate()
+            if key is not None:
+                cached["nominal"] = copy.deepcopy(nominal_instance)
 
-        # Generate components
-        nominal_instance.generate()
         nominal_meshes = {
             name: component.mesh
             for name, component in nominal_instance._named_components.items()
@@ -343,57 +521,62 @@ class SensitivityStudy:
             print("  Generating perturbed geometries...")
             print("    Parameters: ", parameter_dict.keys())
 
+        # Only generate the perturbed geometries which are not cached
+        case_keys = [(parameter, perturbation) for parameter in parameter_dict]
+        cases = [
+            (
+                self.vehicle_constructor,
+                parameter_dict,
+                overrides,
+                parameter,
+                perturbation,
+                self.verbosity,
+            )
+            for parameter, case_key in zip(parameter_dict, case_keys)
+            if case_key not in cached["perturbed"]
+        ]
+        if multiprocess and len(cases) > 1:
+            with mp.Pool(min(len(cases), mp.cpu_count())) as pool:
+                generated = iter(pool.starmap(_generate_perturbed, cases))
+        else:
+            generated = (_generate_perturbed(*case) for case in cases)
+
+        # Perturbed results are only read below, so are cached as they are
+        perturbed = []
+        for case_key in case_keys:
+            if case_key not in cached["perturbed"]:
+                cached["perturbed"][case_key] = next(generated)
+            perturbed.append(cached["perturbed"][case_key])
+
+        if key is not None:
+            # Keep the most recently used parameter sets
+            self._geometry_cache[key] = cached
+            if len(self._geometry_cache) > SENSITIVITY_CACHE_SIZE:
+                del self._geometry_cache[next(iter(self._geometry_cache))]
+
         sensitivities = {}
         analysis_sens = {}
         component_analysis_sens = {}
         property_sens = {}
-        for parameter, value in parameter_dict.items():
-            if self.verbosity > 0:
-                print(f"    Generating for {parameter}.")
-
+        for parameter, dp, parameter_meshes, results, volmass, properties in perturbed:
             sensitivities[parameter] = {}
 
-            # Create copy
-            adjusted_parameters = parameter_dict.copy()
-
-            # Adjust current parameter for sensitivity analysis
-            adjusted_parameters[parameter] *= 1 + perturbation / 100
-            dp = adjusted_parameters[parameter] - value
-
-            # Create Vehicle instance with perturbed parameter
-            constructor_instance = self.vehicle_constructor(
-                **adjusted_parameters, **overrides
-            )
-            parameter_instance = constructor_instance.create_instance()
-            parameter_instance.verbosity = 0
-
-            # Generate stl meshes
-            parameter_instance.generate()
-            parameter_meshes = {
-                name: component.mesh
-                for name, component in parameter_instance._named_components.items()
-            }
-
             # Generate sensitivities for geometric analysis results
             if nominal_instance.analysis_results:
                 analysis_sens[parameter] = {}
                 for r, v in nominal_instance.analysis_results.items():
-                    analysis_sens[parameter][r] = (
-                        parameter_instance.analysis_results[r] - v
-                    ) / dp
+                    analysis_sens[parameter][r] = (results[r] - v) / dp
 
                 # Repeat for components
                 component_analysis_sens[parameter] = (
-                    parameter_instance._volmass - nominal_instance._volmass
+                    volmass - nominal_instance._volmass
                 ) / dp
 
             # Generate sensitivities for vehicle properties
             if nominal_instance.properties:
                 property_sens[parameter] = {}
                 for property, v in nominal_instance.properties.items():
-                    property_sens[parameter][property] = (
-                        parameter_instance.properties[property] - v
-                    ) / dp
+                    property_sens[parameter][property] = (properties[property] - v) / dp
 
             # Generate sensitivities
             for component, nominal_mesh in nominal_meshes.items():
@@ -513,6 +696,21 @@ class SensitivityStudy:
 
             return combined_data_path
 
+    def _instance_key(self, parameter_dict: dict, overrides: dict):
+        """Returns a hashable key of the vehicle parameters, or None if
+        geometry caching is disabled or any of the parameters cannot be
+        hashed.
+        """
+        if not self.cache_geometry:
+            return None
+
+        key = (tuple(sorted(parameter_dict.items())), tuple(sorted(overrides.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
     @staticmethod
     def _compare_meshes(mesh1, mesh2, dp, parameter_name: str) -> pd.DataFrame:
         """Compares two meshes with each other and applies finite differencing
@@ -520,11 +718,12 @@ class SensitivityStudy:
 
         Parameters
         ----------
-        mesh1 : Mesh
-            The reference mesh.
+        mesh1 : Mesh | np.ndarray
+            The reference mesh, or its (n, 3, 3) triangle vertices, as
+            returned by surfce_to_vectors.
 
-        mesh1 : Mesh
-            The perturbed mesh.
+        mesh2 : Mesh | np.ndarray
+            The perturbed mesh, or its triangle vertices.
 
         dp : float
             The parameter perturbation.
@@ -537,42 +736,53 @@ class SensitivityStudy:
         df : pd.DataFrame
             A DataFrame of the finite difference results.
         """
-        # Take the vector difference
-        diff = mesh2.vectors - mesh1.vectors
-
-        # Resize difference array to flatten
-        shape = diff.shape
-        flat_diff = diff.reshape((shape[0] * shape[2], shape[1]))
-
-        # Also flatten the reference mesh vectors
-        vectors = mesh1.vectors.reshape((shape[0] * shape[2], shape[1]))
+        vectors1 = getattr(mesh1, "vectors", mesh1)
+        vectors2 = getattr(mesh2, "vectors", mesh2)
+
+        # Concatenate all data column-wise: reference locations, location
+        # deltas, delta magnitude and sensitivities
+        n_triangles, n_vertices, _ = vectors1.shape
+        all_data = np.empty((n_triangles * n_vertices, 10))
+
+        # Write the reference vertices and their differences straight into
+        # the rows of each triangle, without flattened copies
+        triangle_data = all_data.reshape((n_triangles, n_vertices, 10))
+        triangle_data[..., 0:3] = vectors1
+        np.subtract(
+            vectors2,
+            vectors1,
+            out=triangle_data[..., 3:6],
+            dtype=vectors1.dtype,
+        )
+        deltas = all_data[:, 3:6]
+        np.sqrt(np.square(deltas).sum(axis=1), out=all_data[:, 6])
+        np.divide(deltas, dp, out=all_data[:, 7:10])
 
-        # Concatenate all data column-wise
-        all_data = np.zeros((shape[0] * shape[2], shape[1] * 2))
-        all_data[:, 0:3] = vectors  # Reference locations
-        all_data[:, 3:6] = flat_diff  # Location deltas
+        # Delete duplicate vertices, keeping the first occurrence of each.
+        # Rows are compared as raw bytes, so -0.0 is first folded into 0.0
+        keys = np.add(all_data[:, 0:6], 0.0)
+        keys = keys.view(np.dtype((np.void, keys.itemsize * 6))).ravel()
+        _, unique_idx = np.unique(keys, return_index=True)
+        unique_idx.sort()
 
         # Create DataFrame
-        df = pd.DataFrame(data=all_data, columns=["x", "y", "z", "dx", "dy", "dz"])
-        df["magnitude"] = np.sqrt(np.square(df[["dx", "dy", "dz"]]).sum(axis=1))
-
-        # Sensitivity calculations
-        sensitivities = df[["dx", "dy", "dz"]] / dp
-        sensitivities.rename(
-            columns={
-                "dx": f"dxd{parameter_name}",
-                "dy": f"dyd{parameter_name}",
-                "dz": f"dzd{parameter_name}",
-            },
-            inplace=True,
+        df = pd.DataFrame(
+            data=all_data[unique_idx],
+            columns=[
+                "x",
+                "y",
+                "z",
+                "dx",
+                "dy",
+                "dz",
+                "magnitude",
+                f"dxd{parameter_name}",
+                f"dyd{parameter_name}",
+                f"dzd{parameter_name}",
+            ],
+            index=unique_idx,
         )
 
-        # Merge dataframes
-        df = df.merge(sensitivities, left_index=True, right_index=True)
-
-        # Delete duplicate vertices
-        df = df[~df.duplicated()]
-
         return df
 
     @staticmethod
@@ -595,6 +805,72 @@ class SensitivityStudy:
         return allsens
 
 
+def _generate_perturbed(
+    vehicle_constructor,
+    parameter_dict: dict,
+    overrides: dict,
+    parameter: str,
+    perturbation: float,
+    verbosity: int = 1,
+):
+    """Generates the vehicle geometry with a single parameter perturbed.
+
+    Returns
+    -------
+    parameter : str
+        The name of the perturbed parameter.
+
+    dp : float
+        The parameter perturbation.
+
+    meshes : dict
+        The mesh of each named component.
+
+    analysis_results : dict
+        The vehicle analysis results.
+
+    volmass : pd.DataFrame
+        The component volume and mass results.
+
+    properties : dict
+        The vehicle properties.
+    """
+    if verbosity > 0:
+        print(f"    Generating for {parameter}.")
+
+    # Create copy
+    adjusted_parameters = parameter_dict.copy()
+
+    # Adjust current parameter for sensitivity analysis
+    value = adjusted_parameters[parameter]
+    adjusted_parameters[parameter] *= 1 + perturbation / 100
+    dp = adjusted_parameters[parameter] - value
+
+    # Create Vehicle instance with perturbed parameter
+    constructor_instance = vehicle_constructor(**adjusted_parameters, **overrides)
+    parameter_instance = constructor_instance.create_instance()
+    parameter_instance.verbosity = 0
+
+    # Generate components serially, since this may run in a pool worker
+    parameter_instance.multiprocess = False
+
+    # Generate stl meshes
+    parameter_instance.generate()
+    parameter_meshes = {
+        name: component.mesh
+        for name, component in parameter_instance._named_components.items()
+    }
+
+    return (
+        parameter,
+        dp,
+        parameter_meshes,
+        parameter_instance.analysis_results,
+        parameter_instance._volmass,
+        parameter_instance.properties,
+    )
+
+
 def append_sensitivities_to_tri(
     dp_filenames: List[str],
     components_filepath: Optional[str] = "Components.i.tri",
@@ -662,18 +938,14 @@ def append_sensitivities_to_tri(
 
     # TODO - rename to 'combine sensitivity' or "combine_comp_sens"
     # Parse .tri file
-    tree = ET.parse(components_filepath)
+    tree = ET.parse(components_filepath, parser=_XML_PARSER)
     root = tree.getroot()
     grid = root[0]
     piece = grid[0]
     points = piece[0]
 
     points_data = points[0].text
-
-    points_data_list = [el.split() for el in points_data.splitlines()]
-    points_data_list = [[float(j) for j in i] for i in points_data_list]
-
-    points_df = pd.DataFrame(points_data_list, columns=["x", "y", "z"]).dropna()
+    points_xyz = np.fromstring(points_data, sep=" ").reshape(-1, 3)
 
     # Ensure previous components sensitivity file is not included
     try:
@@ -683,10 +955,7 @@ def append_sensitivities_to_tri(
         pass
 
     # Load and concatenate sensitivity data across components
-    dp_df = pd.DataFrame()
-    for filename in dp_filenames:
-        df = pd.read_csv(filename)
-        dp_df = pd.concat([dp_df, df])
+    dp_df = pd.concat([pd.read_csv(filename) for filename in dp_filenames])
 
     # Extract parameters
     parameters = []
@@ -697,68 +966,33 @@ def append_sensitivities_to_tri(
     # Match points_df to sensitivity df
     if verbosity > 0:
         print("Running coordinate matching algorithm for sensitivities...")
-        pbar = tqdm(
-            total=len(points_df), position=0, leave=True, desc="Point matching progress"
+    all_data, matched = _match_points(
+        points_xyz,
+        dp_df[["x", "y", "z"]].to_numpy(),
+        dp_df[param_cols].to_numpy(dtype=float),
+        match_tolerance,
+    )
+
+    # Round off infinitesimally small values
+    all_data[abs(all_data) < rounding_tolerance] = 0
+
+    # Format data string for each parameter (unmatched points are zero)
+    param_data = {}
+    for p_n, parameter in enumerate(parameters):
+        lines = (
+            f"\t{x:.14e}\t{y:.14e}\t{z:.14e}\n "
+            for x, y, z in all_data[:, 3 * p_n : 3 * p_n + 3].tolist()
         )
-    data_str = "\n "
-    param_data = dict(zip(parameters, ["\n " for _ in parameters]))
-    all_data = np.zeros((len(points_df), len(param_cols)), dtype=float)
-    matched_points = 0
-    for i in range(len(points_df)):
-        match_x = (points_df["x"].iloc[i] - dp_df["x"]).abs() < match_tolerance
-        match_y = (points_df["y"].iloc[i] - dp_df["y"]).abs() < match_tolerance
-        match_z = (points_df["z"].iloc[i] - dp_df["z"]).abs() < match_tolerance
-
-        match = match_x & match_y & match_z
-        try:
-            # TODO - what if there are multiple matches? (due to intersect perturbations)
-            matched_data = dp_df[match].iloc[0][param_cols].values
-
-            # Round off infinitesimally small values
-            matched_data[abs(matched_data) < rounding_tolerance] = 0
-
-            # Update data
-            all_data[i, :] = matched_data
-            p_n = 0
-            for parameter, data_str in param_data.items():
-                line = ""
-                for j in range(3):
-                    line += f"\t{matched_data[j+3*p_n]:.14e}"
-                line += "\n "
-
-                data_str += line
-                param_data[parameter] = data_str
-                p_n += 1
-
-            # Count matched points
-            matched_points += 1
-
-        except IndexError:
-            # No match found, append zeros to maintain order
-            line = f"\t{0:.14e}\t{0:.14e}\t{0:.14e}\n "
-
-            # Update data string for each parameter
-            p_n = 0
-            for parameter, data_str in param_data.items():
-                param_data[parameter] = data_str + line
-                p_n += 1
-
-        # Update progress bar
-        if verbosity > 0:
-            pbar.update(1)
-
-    match_fraction = matched_points / len(points_df)
+        param_data[parameter] = "\n " + "".join(lines)
+
+    match_fraction = int(matched.sum()) / len(points_xyz)
     if verbosity > 0:
-        pbar.close()
         print(f"Done - matched {100*match_fraction:.2f}% of points.")
 
     # Write combined sensitivity data to CSV
-    combined_sense = pd.merge(
-        left=points_df.reset_index(),
-        right=pd.DataFrame(all_data, columns=param_cols),
-        left_index=True,
-        right_index=True,
-    ).drop("index", axis=1)
+    combined_sense = pd.DataFrame(
+        np.hstack([points_xyz, all_data]), columns=["x", "y", "z", *param_cols]
+    )
     combined_sense.to_csv(os.path.join(outdir, combined_sens_fn), index=False)
 
     # Write the matched sensitivity df to i.tri file as new xml element
@@ -781,6 +1015,48 @@ def append_sensitivities_to_tri(
     return match_fraction
 
 
+def _match_points(
+    points: np.ndarray,
+    reference_points: np.ndarray,
+    reference_data: np.ndarray,
+    match_tolerance: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Matches each point to the first reference point with all coordinates
+    within match_tolerance of it.
+
+    Returns
+    -------
+    data : np.ndarray
+        The reference data of the matched reference point for each point,
+        or zeros if there is no match.
+
+    matched : np.ndarray
+        A boolean mask of the points which were matched.
+    """
+    # Find candidate matches (within the tolerance, inclusive)
+    tree = cKDTree(reference_points)
+    candidates = tree.query_ball_point(points, r=match_tolerance, p=np.inf)
+    counts = np.fromiter(map(len, candidates), dtype=int, count=len(points))
+    owner = np.repeat(np.arange(len(points)), counts)
+    ref = np.fromiter(
+        itertools.chain.from_iterable(candidates), dtype=int, count=counts.sum()
+    )
+
+    # Keep strict matches, and the first reference point matching each point
+    strict = np.all(abs(points[owner] - reference_points[ref]) < match_tolerance, 1)
+    owner, ref = owner[strict], ref[strict]
+    order = np.lexsort((ref, owner))
+    owner, first = np.unique(owner[order], return_index=True)
+    ref = ref[order][first]
+
+    data = np.zeros((len(points), reference_data.shape[1]), dtype=float)
+    data[owner] = reference_data[ref]
+    matched = np.zeros(len(points), dtype=bool)
+    matched[owner] = True
+
+    return data, matched
+
+
 def csv_to_delaunay(filepath: str):
     """Converts a csv file of points to a Delaunay3D surface.
 
@@ -814,9 +1090,22 @@ def csv_to_delaunay(filepath: str):
     SaveData(savefilename, proxy=delaunay3D1)
 
 
-def convert_all_csv_to_delaunay(directory: str = ""):
+def convert_all_csv_to_delaunay(
+    directory: str = "", multiprocess: Optional[bool] = False
+):
+    """Converts all csv files in a directory to Delaunay3D surfaces.
+
+    Parameters
+    ------------
+    directory : str, optional
+        The directory containing the CSV files. The default is the current
+        working directory.
+
+    multiprocess : bool, optional
+        Convert the files in parallel, with each file handled by its own
+        ParaView pipeline in a worker process. The default is False.
+    """
     # TODO - rename
-    # TODO - docstrings
     # TODO - specify outdir
     files = glob.glob(os.path.join(directory, "*.csv"))
 
@@ -824,8 +1113,13 @@ def convert_all_csv_to_delaunay(directory: str = ""):
         print(f"No CSV files in directory {directory}.")
         sys.exit()
 
-    for file in files:
-        csv_to_delaunay(file)
+    if multiprocess and len(files) > 1:
+        with mp.Pool(min(len(files), mp.cpu_count())) as pool:
+            pool.map(csv_to_delaunay, files)
+
+    else:
+        for file in files:
+            csv_to_delaunay(file)
 
 
 def merge_stls(
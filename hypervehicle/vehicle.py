@@ -27,6 +27,7 @@ class Vehicle:
         self.name = "vehicle"
         self.vehicle_angle_offset: float = 0
         self.verbosity = 1
+        self.multiprocess = False
         self.properties = {}  # user-defined vehicle properties from generator
 
         # Analysis attributes
@@ -62,12 +63,28 @@ class Vehicle:
             vstr += f" with {len(self.components)} components"
         return vstr
 
-    def configure(self, name: str = None, verbosity: int = 1):
-        """Configure the Vehicle instance."""
+    def configure(
+        self, name: str = None, verbosity: int = 1, multiprocess: bool = False
+    ):
+        """Configure the Vehicle instance.
+
+        Parameters
+        ----------
+        name : str, optional
+            The name of the vehicle. The default is None.
+
+        verbosity : int, optional
+            The vehicle verbosity. The default is 1.
+
+        multiprocess : bool, optional
+            Generate the STL surfaces of each component's patches
+            concurrently. The default is False.
+        """
         if name is not None:
             self.name = name
 
         self.verbosity = verbosity
+        self.multiprocess = multiprocess
 
     def add_component(
         self,
@@ -208,6 +225,7 @@ class Vehicle:
 
             # Generate component patches
             component.generate_patches()
+            component._multiprocess = self.multiprocess
 
             # Apply the modifier function
             component.apply_modifier()
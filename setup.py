@@ -53,7 +53,6 @@ setuptools.setup(
         "scipy >= 1.10.0",
         "pandas >= 1.5.2",
         "art >= 5.8",
-        "tqdm >= 4.64.1",
         "multiprocess >= 0.70.14",
         "pymeshfix >= 0.16.2",
         "gdtk @ git+https://git@github.com/gdtk-uq/gdtk.git#subdirectory=src/lib",
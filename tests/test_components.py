@@ -0,0 +1,36 @@
+import numpy as np
+from stl import mesh
+from hypervehicle.components import SweptComponent
+from hypervehicle.geometry import Vector3, Line
+
+
+def _swept_component():
+    def square(z, a):
+        corners = [Vector3(-a, -a, z), Vector3(a, -a, z), Vector3(a, a, z)]
+        corners.append(Vector3(-a, a, z))
+        return [Line(corners[i], corners[(i + 1) % 4]) for i in range(4)]
+
+    sections = [square(0, 1), square(1, 0.5), square(2, 0.7)]
+    return SweptComponent(sections, stl_resolution=3, verbosity=0)
+
+
+def test_to_stl_streaming(tmp_path):
+    # Write with the component mesh
+    component = _swept_component()
+    component.generate_patches()
+    component.to_stl(str(tmp_path / "mesh.stl"))
+
+    # Stream without surfaces, and with the surfaces already generated
+    streamed = _swept_component()
+    streamed.generate_patches()
+    streamed.to_stl_streaming(str(tmp_path / "streamed.stl"))
+
+    surfaced = _swept_component()
+    surfaced.generate_patches()
+    surfaced.surface()
+    surfaced.to_stl_streaming(str(tmp_path / "surfaced.stl"))
+
+    expected = mesh.Mesh.from_file(str(tmp_path / "mesh.stl"))
+    for name in ("streamed.stl", "surfaced.stl"):
+        written = mesh.Mesh.from_file(str(tmp_path / name))
+        assert np.array_equal(written.vectors, expected.vectors)
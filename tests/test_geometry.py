@@ -0,0 +1,196 @@
+import pickle
+import numpy as np
+from hypervehicle import geometry
+from hypervehicle.geometry import (
+    CachedPath,
+    ConePatch,
+    CoonsPatch,
+    CubePatch,
+    CurvedPatch,
+    Line,
+    MirroredPatch,
+    OffsetPatchFunction,
+    RevolvedPatch,
+    RotatedPatch,
+    SpherePatch,
+    Vector3,
+    register_vectorized,
+    vectorized_evaluator,
+)
+from hypervehicle.utilities import surfce_to_stl
+from hypervehicle.components import RevolvedComponent
+from hypervehicle.components.common import uniform_thickness_function
+
+
+def test_register_vectorized():
+    class SubCone(ConePatch):
+        pass
+
+    calls = []
+
+    def evaluator(surface, r, s):
+        calls.append(r.shape)
+        return ConePatch.vectorized(surface, r, s)
+
+    register_vectorized(SubCone, evaluator)
+    try:
+        cone = ConePatch(0, 1, 0.2, 0.5, 0.1, 1.4)
+        sub_cone = SubCone(0, 1, 0.2, 0.5, 0.1, 1.4)
+
+        # Unregistered types fall back to their own vectorized method
+        assert vectorized_evaluator(cone) == cone.vectorized
+        assert not calls
+
+        # Registered evaluators are used for the type
+        sub_mesh = surfce_to_stl(sub_cone, 4, 5)
+        assert calls
+        assert np.array_equal(sub_mesh.vectors, surfce_to_stl(cone, 4, 5).vectors)
+
+    finally:
+        del geometry._VECTORIZED_EVALUATORS[SubCone]
+
+
+def test_evaluate_grid():
+    cone = ConePatch(0, 1, 0.2, 0.5, 0.1, 1.4)
+    r_list = np.linspace(0, 1, 41) ** 2
+    s_list = np.linspace(0, 1, 33)
+    r, s = np.meshgrid(r_list, s_list, indexing="ij")
+    expected = cone.vectorized(r, s)
+
+    # Grids split into tiles give the same points as a single evaluation
+    points = np.empty(r.shape + (3,))
+    assert (
+        geometry.evaluate_grid(cone, cone.vectorized, r_list, s_list, points) is points
+    )
+    assert np.array_equal(points, expected)
+
+    for max_points in (1, 7, 64):
+        points = np.empty(r.shape + (3,))
+        geometry._evaluate_tiles(cone.vectorized, r_list, s_list, points, max_points)
+        assert np.array_equal(points, expected)
+
+
+def test_cached_path():
+    line = Line(Vector3(0, 0.2, 0.1), Vector3(1, 0.5, -0.2))
+    path = CachedPath(line)
+
+    point = path(0.3)
+    assert (point.x, point.y, point.z) == (line(0.3).x, line(0.3).y, line(0.3).z)
+
+    # Modifying a returned point does not change later evaluations
+    point.x = 10.0
+    assert path(0.3).x == line(0.3).x
+
+    # The memo is bounded
+    for t in np.linspace(0, 1, geometry.PATH_CACHE_SIZE + 10):
+        path(t)
+    assert path._coordinates.cache_info().currsize == geometry.PATH_CACHE_SIZE
+
+    # Pickling drops the memo, but not the path
+    copied = pickle.loads(pickle.dumps(path))
+    assert copied._coordinates.cache_info().currsize == 0
+    assert copied(0.3).y == line(0.3).y
+
+    # Walking more stations than the memo holds shares nothing, unless the
+    # memo is sized for them
+    stations = np.linspace(0, 1, geometry.PATH_CACHE_SIZE + 10)
+    for maxsize, hits in [
+        (geometry.PATH_CACHE_SIZE, 0),
+        (len(stations), len(stations)),
+    ]:
+        path = CachedPath(line, maxsize=maxsize)
+        for _ in range(2):
+            for t in stations:
+                path(t)
+        assert path._coordinates.cache_info().hits == hits
+
+
+def test_revolved_component_path_cache():
+    line = Line(Vector3(0, 0.2, 0.1), Vector3(1, 0.5, -0.2))
+    for resolution in (4, 2 * geometry.PATH_CACHE_SIZE):
+        component = RevolvedComponent(line, stl_resolution=resolution)
+        component.generate_patches()
+        paths = {id(patch.line): patch.line for patch in component.patches.values()}
+        assert len(paths) == 1
+        (path,) = paths.values()
+        maxsize = path._coordinates.cache_info().maxsize
+        assert maxsize >= max(geometry.PATH_CACHE_SIZE, resolution + 1)
+
+
+def _points(surface):
+    r, s = np.meshgrid(np.linspace(0, 1, 4), np.linspace(0, 1, 5), indexing="ij")
+    return np.array(
+        [[p.x, p.y, p.z] for p in map(surface, r.ravel(), s.ravel())]
+    ).reshape(r.shape + (3,))
+
+
+def test_rotated_patch_compose():
+    cone = ConePatch(0, 1, 0.2, 0.5, 0.1, 1.4)
+    point = Vector3(x=0.3, y=-0.2, z=0.1)
+
+    # Rotations about the same axis and point are merged
+    nested = RotatedPatch(RotatedPatch(cone, 0.4, "y", point), 0.7, "y", point)
+    composed = RotatedPatch.compose(
+        RotatedPatch(cone, 0.4, "y", point), 0.7, "y", point
+    )
+    assert composed.underlying_surf is cone
+    assert composed.angle == 0.4 + 0.7
+    assert np.allclose(_points(composed), _points(nested), rtol=0, atol=1e-12)
+
+    # Rotations which cancel, and zero rotations, return the surface
+    assert RotatedPatch.compose(RotatedPatch(cone, 0.4, "y"), -0.4, "y") is cone
+    assert RotatedPatch.compose(cone, 0, "z") is cone
+
+    # Other axes, points and reflections are nested
+    fallbacks = [
+        RotatedPatch(cone, 0.4, "x"),
+        RotatedPatch(cone, 0.4, "y", point),
+        MirroredPatch(RotatedPatch(cone, 0.4, "y"), "y"),
+    ]
+    for surface in fallbacks:
+        composed = RotatedPatch.compose(surface, 0.7, "y")
+        nested = RotatedPatch(surface, 0.7, "y")
+        assert composed.underlying_surf is surface
+        assert np.array_equal(_points(composed), _points(nested))
+
+
+def test_vectorized_matches_scalar():
+    coons = CoonsPatch(
+        p00=Vector3(0, 0),
+        p01=Vector3(0, 1),
+        p11=Vector3(1, 1.2),
+        p10=Vector3(1, 0, 0.3),
+    )
+    cone = ConePatch(0, 1, 0.2, 0.5, 0.1, 1.4)
+    line = Line(Vector3(0, 0.2, 0.1), Vector3(1, 0.5, -0.2))
+    centre = Vector3(0.1, 0.2, 0.3)
+
+    def offset(x, y, z=0):
+        return Vector3(x=0, y=0.1 * x, z=0.2 * y)
+
+    surfaces = [
+        cone,
+        RevolvedPatch(line, 0.3, 1.7),
+        RevolvedPatch(CachedPath(line)),
+        OffsetPatchFunction(coons, uniform_thickness_function(0.05, "top")),
+        OffsetPatchFunction(cone, offset),
+        CurvedPatch(coons, "x", lambda x, y: 0.1 * x * x, lambda x, y: 0.2 * x),
+        CurvedPatch(cone, "y", lambda x, y: 0.1 * y * y, lambda x, y: 0.2 * y),
+        MirroredPatch(cone, "y"),
+        MirroredPatch(coons, "z"),
+    ]
+    surfaces += [
+        RotatedPatch(surface, 0.7, axis, Vector3(0.3, -0.2, 0.1))
+        for surface in (cone, coons)
+        for axis in "xyz"
+    ]
+    for face in ("east", "west", "south", "north", "bottom", "top"):
+        surfaces.append(CubePatch(1.3, centre, face))
+        surfaces.append(SpherePatch(1.3, centre, face))
+
+    r, s = np.meshgrid(np.linspace(0, 1, 4), np.linspace(0, 1, 5), indexing="ij")
+    for surface in surfaces:
+        expected = _points(surface)
+        points = surface.vectorized(r, s)
+        assert points.shape == r.shape + (3,), surface
+        assert np.allclose(points, expected, rtol=0, atol=1e-12), surface
@@ -0,0 +1,178 @@
+import numpy as np
+from hypervehicle import Vehicle, utilities
+from hypervehicle.generator import Generator
+from hypervehicle.components import SweptComponent
+from hypervehicle.geometry import ConePatch, CoonsPatch, Line, Vector3
+from hypervehicle.utilities import (
+    SensitivityStudy,
+    _match_points,
+    surfce_to_stl,
+    surfce_to_vectors,
+)
+
+
+def test_match_points():
+    tolerance = 0.5
+    points = np.array(
+        [
+            [0.0, 0.0, 0.0],  # Two matches, the first is further away
+            [2.0, 0.0, 0.0],  # Only on the tolerance boundary
+            [4.0, 0.0, 0.0],  # Within tolerance in x, but not in z
+            [6.0, 0.0, 0.0],  # No match
+        ]
+    )
+    reference_points = np.array(
+        [
+            [0.25, 0.25, -0.25],
+            [0.0, 0.0, 0.125],
+            [2.5, 0.0, 0.0],
+            [4.25, 0.0, 0.75],
+            [1.5, 0.0, 0.0],
+        ]
+    )
+    reference_data = np.arange(10 * len(reference_points), dtype=float).reshape(-1, 10)
+
+    data, matched = _match_points(points, reference_points, reference_data, tolerance)
+
+    assert matched.tolist() == [True, False, False, False]
+    assert np.array_equal(data[0], reference_data[0])
+    assert not data[1:].any()
+
+
+def test_match_points_brute_force():
+    rng = np.random.default_rng(0)
+    tolerance = 0.1
+    reference_points = rng.integers(0, 5, (200, 3)) * 0.1
+    points = np.vstack([reference_points[::3] + 0.05, rng.random((50, 3)) * 0.4])
+    reference_data = rng.random((len(reference_points), 6))
+
+    data, matched = _match_points(points, reference_points, reference_data, tolerance)
+
+    # Compare to matching each point against each reference point in turn
+    for i, point in enumerate(points):
+        within = np.all(abs(reference_points - point) < tolerance, axis=1)
+        assert matched[i] == within.any()
+        if within.any():
+            assert np.array_equal(data[i], reference_data[np.argmax(within)])
+        else:
+            assert not data[i].any()
+
+
+def test_surfce_to_vectors():
+    patches = [
+        ConePatch(0, 1, 0.2, 0.5, 0.1, 1.4),
+        CoonsPatch(
+            p00=Vector3(0, 0),
+            p01=Vector3(0, 1),
+            p11=Vector3(1, 1.2),
+            p10=Vector3(1, 0, 0.3),
+        ),
+    ]
+    for patch in patches:
+        for mirror_y in (False, True):
+            vectors = surfce_to_vectors(patch, 5, 3, si=1.3, mirror_y=mirror_y)
+            stl_vectors = surfce_to_stl(patch, 5, 3, si=1.3, mirror_y=mirror_y).vectors
+            assert vectors.dtype == stl_vectors.dtype
+            assert np.array_equal(vectors, stl_vectors)
+
+            # Write into a provided array
+            out = np.empty_like(vectors)
+            assert (
+                surfce_to_vectors(patch, 5, 3, si=1.3, mirror_y=mirror_y, out=out)
+                is out
+            )
+            assert np.array_equal(out, stl_vectors)
+
+        # Mirroring negates y
+        mirrored = surfce_to_vectors(patch, 5, 3, mirror_y=True)
+        vectors = surfce_to_vectors(patch, 5, 3)
+        assert np.array_equal(mirrored[..., 1], -vectors[..., 1])
+        assert np.array_equal(mirrored[..., [0, 2]], vectors[..., [0, 2]])
+
+
+class _BoxGenerator(Generator):
+    generated = 0
+    multiprocess = False
+
+    def __init__(self, **kwargs):
+        self.a = 1.0
+        self.b = 0.5
+        super().__init__(**kwargs)
+
+    def create_instance(self):
+        _BoxGenerator.generated += 1
+
+        def section(z, a, b):
+            corners = [Vector3(-a, -b, z), Vector3(a, -b, z), Vector3(a, b, z)]
+            corners.append(Vector3(-a, b, z))
+            return [Line(corners[i], corners[(i + 1) % 4]) for i in range(4)]
+
+        vehicle = Vehicle()
+        vehicle.configure("box", verbosity=0, multiprocess=self.multiprocess)
+        box = SweptComponent(
+            [section(0, self.a, self.b), section(1, 0.7 * self.a, self.b)],
+            stl_resolution=2,
+        )
+        vehicle.add_component(box, name="box")
+        return vehicle
+
+
+def test_sensitivity_geometry_cache():
+    parameters = {"a": 1.0, "b": 0.5}
+
+    def run(study, **kwargs):
+        _BoxGenerator.generated = 0
+        sensitivities = study.dvdp({**parameters, **kwargs}, write_nominal_stl=False)
+        return sensitivities, _BoxGenerator.generated
+
+    # Geometry is regenerated unless caching is enabled
+    study = SensitivityStudy(_BoxGenerator, verbosity=0)
+    reference, generated = run(study)
+    assert generated == 3
+    assert run(study)[1] == 3
+
+    cached_study = SensitivityStudy(_BoxGenerator, verbosity=0, cache_geometry=True)
+    assert run(cached_study)[1] == 3
+    sensitivities, generated = run(cached_study)
+    assert generated == 0
+    for parameter, components in reference.items():
+        for component, df in components.items():
+            assert df.equals(sensitivities[parameter][component])
+
+    # The nominal instance is a copy of the cached geometry
+    nominal = cached_study.nominal_vehicle_instance
+    nominal._named_components["box"].mesh.vectors[:] = 0
+    run(cached_study)
+    assert cached_study.nominal_vehicle_instance is not nominal
+    assert cached_study.nominal_vehicle_instance._named_components[
+        "box"
+    ].mesh.vectors.any()
+
+    # The cache is bounded
+    for n in range(utilities.SENSITIVITY_CACHE_SIZE + 2):
+        run(cached_study, a=1.0 + 0.1 * (n + 1))
+    assert len(cached_study._geometry_cache) == utilities.SENSITIVITY_CACHE_SIZE
+    assert run(cached_study)[1] == 3
+
+
+class _MultiprocessBoxGenerator(_BoxGenerator):
+    multiprocess = True
+
+
+def test_sensitivity_multiprocess():
+    parameters = {"a": 1.0, "b": 0.5}
+    reference = SensitivityStudy(_BoxGenerator, verbosity=0).dvdp(
+        parameters, write_nominal_stl=False
+    )
+
+    # Perturbed geometries are generated in worker processes, including for
+    # vehicles which generate their own components concurrently
+    for generator in (_BoxGenerator, _MultiprocessBoxGenerator):
+        study = SensitivityStudy(generator, verbosity=0)
+        sensitivities = study.dvdp(
+            parameters, write_nominal_stl=False, multiprocess=True
+        )
+        assert sensitivities.keys() == reference.keys()
+        for parameter, components in reference.items():
+            for component, df in components.items():
+                assert df.equals(sensitivities[parameter][component])